@@ -1,2 +1,2 @@
 # api package initializer
-__all__ = ["endpoints", "riot_client"]
\ No newline at end of file
+__all__ = ["endpoints", "json_utils", "riot_client"]
\ No newline at end of file
@@ -1,8 +1,22 @@
 # endpoints.py
 
+from itertools import chain
+from operator import itemgetter
 from .riot_client import RiotAPIClient
 import pandas as pd
 
+# URL templates, filled with str.format per call
+_ROOT_URL = "https://{region}.api.riotgames.com"
+_ACCOUNT_BY_RIOT_ID_URL = _ROOT_URL + "/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+_ACCOUNT_BY_PUUID_URL = _ROOT_URL + "/riot/account/v1/accounts/by-puuid/{puuid}"
+_LEAGUE_URL = _ROOT_URL + "/lol/league/v4/{tier}leagues/by-queue/{queue}"
+_MATCH_IDS_URL = _ROOT_URL + "/lol/match/v5/matches/by-puuid/{puuid}/ids"
+_MATCH_URL = _ROOT_URL + "/lol/match/v5/matches/{match_id}"
+
+# Riot ID <-> puuid mappings rarely change, so successful lookups are kept for the process lifetime
+_puuid_cache: dict[tuple[str, str, str], str] = {}
+_idtag_cache: dict[tuple[str, str], dict] = {}
+
 def get_puuid(client:RiotAPIClient, gameName:str, tagLine:str, region:str="americas") -> str | None:
     """Gets the puuid from riot_id and riot_tag
     
@@ -16,12 +30,16 @@ def get_puuid(client:RiotAPIClient, gameName:str, tagLine:str, region:str="ameri
         str: puuid
     """
 
-    root_url = f"https://{region}.api.riotgames.com"
-    endpoint = f"/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+    key = (region, gameName, tagLine)
+    if key in _puuid_cache:
+        return _puuid_cache[key]
 
-    data = client.request(root_url + endpoint)
+    data = client.request(_ACCOUNT_BY_RIOT_ID_URL.format(region=region, gameName=gameName, tagLine=tagLine))
 
-    return data["puuid"] if data else None
+    if not data:
+        return None
+    _puuid_cache[key] = data["puuid"]
+    return data["puuid"]
 
 def get_idtag_from_puuid(client:RiotAPIClient, puuid:str, region:str="americas") -> dict | None:
     """Gets the riot_id and riot_tag from a puuid
@@ -35,17 +53,18 @@ def get_idtag_from_puuid(client:RiotAPIClient, puuid:str, region:str="americas")
         id (dict): Dictionary with riot_id and riot_tag
     """
 
-    root_url = f"https://{region}.api.riotgames.com"
-    endpoint = f"/riot/account/v1/accounts/by-puuid/{puuid}"
+    key = (region, puuid)
+    if key not in _idtag_cache:
+        data = client.request(_ACCOUNT_BY_PUUID_URL.format(region=region, puuid=puuid))
 
-    data = client.request(root_url + endpoint)
-
-    if not data:
-        return None
-    return {
-        "gameName": data.get("gameName"),
-        "tagLine": data.get("tagLine")
-    }
+        if not data:
+            return None
+        _idtag_cache[key] = {
+            "gameName": data.get("gameName"),
+            "tagLine": data.get("tagLine")
+        }
+    # Copy so callers can't mutate the cached entry
+    return dict(_idtag_cache[key])
 
 def get_ladder(client:RiotAPIClient, region:str="na1", top:int=500, queue:str="RANKED_SOLO_5x5") -> pd.DataFrame:
     """Gets the top X players in soloq
@@ -58,7 +77,6 @@ def get_ladder(client:RiotAPIClient, region:str="na1", top:int=500, queue:str="R
     
     Returns:
         pd.DataFrame: Returns a DataFrame of the top X players in soloq containing:
-            - index
             - rank: top X player
             - puuid: puuid
             - leaguePoints
@@ -70,31 +88,30 @@ def get_ladder(client:RiotAPIClient, region:str="na1", top:int=500, queue:str="R
             - hotStreak
     """
     
-    root_url = f"https://{region}.api.riotgames.com"
-    challenger = f"/lol/league/v4/challengerleagues/by-queue/{queue}"
-    grandmaster = f"/lol/league/v4/grandmasterleagues/by-queue/{queue}"
-    master = f"/lol/league/v4/masterleagues/by-queue/{queue}"
+    challenger = _LEAGUE_URL.format(region=region, tier="challenger", queue=queue)
+    grandmaster = _LEAGUE_URL.format(region=region, tier="grandmaster", queue=queue)
+    master = _LEAGUE_URL.format(region=region, tier="master", queue=queue)
     
     params = {"queue": queue}
 
-    chall_response = client.request(root_url + challenger, params=params)
-    if not chall_response: return pd.DataFrame()
-    chall_df = pd.DataFrame(chall_response["entries"]).sort_values("leaguePoints", ascending=False).reset_index(drop=True)
-
-    gm_df = pd.DataFrame()
-    m_df = pd.DataFrame()
+    def tier_entries(response):
+        # Sort within a tier only; tiers stay in challenger > grandmaster > master order
+        return sorted(response.get("entries", []), key=itemgetter("leaguePoints"), reverse=True)
 
-    if top > 250:
-        gm_response = client.request(root_url + grandmaster, params=params)
-        if gm_response: gm_df = pd.DataFrame(gm_response["entries"]).sort_values("leaguePoints", ascending=False).reset_index(drop=True)
-    if top > 750:
-        m_response = client.request(root_url + master, params=params)
-        if m_response: m_df = pd.DataFrame(m_response["entries"]).sort_values("leaguePoints", ascending=False).reset_index(drop=True)
+    chall_response = client.request(challenger, params=params)
+    if not chall_response: return pd.DataFrame()
+    entries = tier_entries(chall_response)
 
-    df = pd.concat([chall_df, gm_df, m_df]).reset_index(drop=True)[:top]
+    # Only fetch lower tiers while the ladder is still short of top
+    if len(entries) < top:
+        gm_response = client.request(grandmaster, params=params)
+        if gm_response: entries += tier_entries(gm_response)
+    if len(entries) < top:
+        m_response = client.request(master, params=params)
+        if m_response: entries += tier_entries(m_response)
 
-    df = df.reset_index(drop=False).drop(columns=["rank"]).rename(columns={"index":"rank"})
-    df["rank"] += 1
+    df = pd.DataFrame(entries[:top]).drop(columns=["rank"], errors="ignore")
+    df.insert(0, "rank", range(1, len(df) + 1))
 
     return df
 
@@ -114,12 +131,43 @@ def get_match_history(client:RiotAPIClient, puuid:str, region:str="americas", st
         list: list of match ids
     """
 
-    root_url = f"https://{region}.api.riotgames.com"
-    endpoint = f"/lol/match/v5/matches/by-puuid/{puuid}/ids"
-    
     params = {"start": start, "count": count, "queue": queue, "type": type}
 
-    return client.request(root_url + endpoint, params=params)
+    return client.request(_MATCH_IDS_URL.format(region=region, puuid=puuid), params=params)
+
+def get_all_match_history(client:RiotAPIClient, puuid:str, total:int, region:str="americas", page:int=100, queue:int=420, type:str="ranked") -> list[str] | None:
+    """Get up to X number of matches from a puuid, paging past Riot's 100 ids per call limit
+    
+    Args:
+        client (RiotAPIClient): Client to access Riot API.
+        puuid (str): puuid.
+        total (int): Maximum number of match ids to return.
+        region (str, optional): Region. Defaults to "americas".
+        page (int, optional): Match ids requested per call, clamped to 1-100. Defaults to 100.
+        queue (int, optional): Filter for list of match ids. Defaults to 420, queue_id for 5x5 Ranked Solo Summoner"s Rift.
+        type (str, optional): Filter for list of match ids. Defaults to "ranked".
+    
+    Returns:
+        list: deduplicated list of match ids, newest first
+    """
+
+    # Riot only accepts 1 <= count <= 100
+    page = max(1, min(page, 100))
+
+    pages = []
+    for start in range(0, total, page):
+        count = min(page, total - start)
+        match_ids = get_match_history(client=client, puuid=puuid, region=region, start=start, count=count, queue=queue, type=type)
+        if match_ids is None:
+            if not pages: return None
+            break
+        pages.append(match_ids)
+        # A short page means the player's history is exhausted
+        if len(match_ids) < count:
+            break
+
+    # Ids can shift between pages if the player finishes a game mid-crawl
+    return list(dict.fromkeys(chain.from_iterable(pages)))
 
 def get_match_data_from_id(client:RiotAPIClient, match_id:str, region:str="americas") -> dict | None:
     """Get match data from given match id
@@ -133,7 +181,4 @@ def get_match_data_from_id(client:RiotAPIClient, match_id:str, region:str="ameri
         dict: dictionary of uncleaned match data
     """
 
-    root_url = f"https://{region}.api.riotgames.com"
-    endpoint = f"/lol/match/v5/matches/{match_id}"
-
-    return client.request(root_url + endpoint)
\ No newline at end of file
+    return client.request(_MATCH_URL.format(region=region, match_id=match_id))
\ No newline at end of file
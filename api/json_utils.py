@@ -0,0 +1,16 @@
+# json_utils.py
+
+import json
+
+# orjson is optional: a faster drop-in when installed, stdlib json otherwise
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        # Decoded back to str so the data column stays TEXT and json_extract keeps working on it
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
@@ -1,70 +1,146 @@
 import time
 import os
+import logging
+import threading
+from collections import deque
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from .json_utils import _json_loads
+
+log = logging.getLogger(__name__)
+
+# Regional (account/match) and platform (league) routing values
+RIOT_ROUTES = (
+    "americas", "europe", "asia", "sea",
+    "br1", "eun1", "euw1", "jp1", "kr", "la1", "la2", "me1",
+    "na1", "oc1", "ru", "sg2", "tr1", "tw2", "vn2",
+)
+
+def _parse_rate_header(header: str | None) -> dict[int, int]:
+    """Parse a Riot rate-limit header like "20:1,100:120" into {seconds: count}."""
+    pairs = {}
+    for part in (header or "").split(","):
+        try:
+            value, seconds = part.split(":")
+            pairs[int(seconds)] = int(value)
+        except ValueError:
+            continue
+    return pairs
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter enforcing several Riot windows at once.
+
+    Unlike a refilling token bucket, a sliding log never lets more than
+    max_requests through in any span of `seconds`, which is what Riot enforces.
+    """
+    def __init__(self, limits: dict[int, int]):
+        self.limits = dict(limits)  # {seconds: max_requests}
+        self.timestamps = deque()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _wait_time(self, now: float) -> tuple[float, int, int]:
+        longest = max(self.limits)
+        # Timestamps are appended in order, so expired ones are always on the left
+        while self.timestamps and now - self.timestamps[0] >= longest:
+            self.timestamps.popleft()
+        wait, max_requests, seconds = self.blocked_until - now, 0, 0
+        for window, limit in self.limits.items():
+            # Only the limit-th newest request decides when this window frees a slot
+            if len(self.timestamps) >= limit:
+                window_wait = window - (now - self.timestamps[-limit])
+                if window_wait > wait:
+                    wait, max_requests, seconds = window_wait, limit, window
+        return wait, max_requests, seconds
+
+    def acquire(self):
+        """Block until a request may be sent, then reserve its slot."""
+        while True:
+            with self.lock:
+                now = time.time()
+                wait, max_requests, seconds = self._wait_time(now)
+                if wait <= 0:
+                    self.timestamps.append(now)
+                    return
+            if max_requests:
+                log.info("Waiting %.2fs due to %d requests per %d seconds limit.", wait, max_requests, seconds)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` and restart the windows (after a 429)."""
+        with self.lock:
+            self.timestamps.clear()
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+    def sync(self, headers):
+        """Reconcile limits and counts with Riot's X-App-Rate-Limit headers."""
+        limits = _parse_rate_header(headers.get("X-App-Rate-Limit"))
+        counts = _parse_rate_header(headers.get("X-App-Rate-Limit-Count"))
+        with self.lock:
+            if limits:
+                self.limits = limits
+            # Requests Riot has counted but we have not (e.g. another process on the same key)
+            used = counts.get(max(self.limits), 0)
+            missing = used - len(self.timestamps)
+            if missing > 0:
+                self.timestamps.extend([time.time()] * missing)
 
 class RiotAPIClient:
     def __init__(self):
         load_dotenv()
         self.api_key = os.environ.get("riot_api_key")
-        # Strict Riot limits
-        self.per_second = 20
-        self.per_window = 100
-        self.window_seconds = 120
-        self.timestamps = []
+        # Strict Riot limits, refined from response headers
+        self.limiter = RateLimiter({1: 20, 120: 100})
+        # Reuse keep-alive connections instead of a new TLS handshake per call
+        self.session = requests.Session()
+        self.session.headers.update({"X-Riot-Token": self.api_key})
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+        # A dedicated pool per host so calls to one route never evict another's sockets
+        for route in RIOT_ROUTES:
+            self.session.mount(
+                f"https://{route}.api.riotgames.com",
+                HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=0)
+            )
 
-    def _respect_rate_limit(self):
-        now = time.time()
-        self.timestamps = [t for t in self.timestamps if now - t < self.window_seconds]
-        if len(self.timestamps) >= self.per_window:
-            wait_time = self.window_seconds - (now - self.timestamps[0])
-            self.timestamps = []
-            print(f"\n[THROTTLE] Waiting {wait_time:.2f}s due to {self.per_window} requests per {self.window_seconds} seconds limit.")
-            time.sleep(max(wait_time, 0))
-            now = time.time()
-        recent = [t for t in self.timestamps if now - t < 1.0]
-        if len(recent) >= self.per_second:
-            wait_time = 1.0 - (now - recent[0])
-            print(f"\n[THROTTLE] Waiting {wait_time:.2f}s due to {self.per_second} requests per second limit.")
-            time.sleep(max(wait_time, 0))
-        return
+    def close(self):
+        """Close the underlying HTTP session and its pooled connections."""
+        self.session.close()
 
     def request(self, url, params=None, max_attempts=5):
         attempt = 0
         while attempt < max_attempts:
-            self._respect_rate_limit()
-            headers = {"X-Riot-Token": self.api_key}
+            self.limiter.acquire()
             try:
-                resp = requests.get(url, headers=headers, params=params, timeout=30)
+                resp = self.session.get(url, params=params, timeout=30)
             except Exception as e:
-                print(f"\n[ERROR] Network Exception on attempt {attempt + 1}: {e}")
+                log.warning("Network Exception on attempt %d: %s", attempt + 1, e)
                 attempt += 1
                 time.sleep(min(2 ** attempt, 30))
                 continue
 
-            self.timestamps.append(time.time())
+            self.limiter.sync(resp.headers)
 
             if resp.status_code == 200:
                 try:
-                    return resp.json()
+                    return _json_loads(resp.content)
                 except Exception as e:
-                    print(f"\n[ERROR] Exception parsing JSON: {e}")
+                    log.warning("Exception parsing JSON: %s", e)
                     return resp.text
             elif resp.status_code == 429:
                 retry_after = int(resp.headers.get("Retry-After", "1"))
-                print(f"\n[ERROR] 429 Too Many Requests. Retry-After: {retry_after} seconds")
-                self.timestamps = []
-                time.sleep(retry_after)
+                log.warning("429 Too Many Requests. Retry-After: %d seconds", retry_after)
+                self.limiter.pause(retry_after)
                 attempt += 1
             elif resp.status_code >= 500:
-                print(f"\n[ERROR] Server Error {resp.status_code}: {resp.text}")
+                log.warning("Server Error %d: %s", resp.status_code, resp.text)
                 attempt += 1
                 time.sleep(min(2 ** attempt, 30))
             elif resp.status_code >= 400:
-                print(f"\n[ERROR] Client Error {resp.status_code}: {resp.text}")
+                log.warning("Client Error %d: %s", resp.status_code, resp.text)
                 return None
             else:
-                print(f"\n[ERROR] Unexpected Response {resp.status_code}: {resp.text}")
+                log.warning("Unexpected Response %d: %s", resp.status_code, resp.text)
                 return None
-        print(f"\n[ERROR] Max attempts reached for URL: {url}")
+        log.warning("Max attempts reached for URL: %s", url)
         return None
\ No newline at end of file
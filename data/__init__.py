@@ -1,2 +1,2 @@
 # data package initializer
-__all__ = ["collector", "cleaner", "database"]
\ No newline at end of file
+__all__ = ["collector", "cleaner", "database", "progress"]
\ No newline at end of file
@@ -1,20 +1,185 @@
-import json
+import logging
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from api.json_utils import _json_loads
 from . import database as db
+from .database import version_to_tuple
+from .progress import Progress
 
-def version_to_tuple(v: str) -> tuple[int, int]:
-    """Convert '15.14' -> (15, 14) for comparison."""
+log = logging.getLogger(__name__)
+
+# Errors malformed match data can raise, while parsing (missing keys, wrong types, bad JSON)
+# or while binding row values (nested or oversized values); anything else is a bug and should surface.
+# IntegrityError is not listed: every insert is INSERT OR IGNORE and foreign keys are off.
+MATCH_ERRORS = (
+    KeyError, TypeError, AttributeError, ValueError, OverflowError,
+    sqlite3.ProgrammingError, sqlite3.InterfaceError
+)
+
+
+def build_rows(raw_data: str, min_duration: int|None = None, min_patch: str|None = None) -> dict[str, list[dict]] | None:
+    """
+    Parse one raw match JSON into the rows for each clean table.
+
+    Pure function (no DB access) so it can run in a worker process.
+
+    Args:
+        raw_data (str): Raw match JSON as stored in raw_matches.
+        min_duration (str, optional): Minimum time in seconds a match must last to be used for analysis. Defaults to None.
+        min_patch (str, optional): Minimum patch a match must be to used for analysis. Defaults to None.
+
+    Returns:
+        dict: Clean table name -> list of row dicts, or None if the match is filtered out.
+    """
+    match_json = _json_loads(raw_data)
+    metadata = match_json["metadata"]
+    info = match_json["info"]
+
+    if min_duration and info.get("gameDuration") < min_duration:
+        return None
+
+    major, _, rest = info.get("gameVersion", "").partition(".")
+    minor, _, _ = rest.partition(".")
+    game_version = f"{major}.{minor}" if rest else major
+    if min_patch and version_to_tuple(game_version) < version_to_tuple(min_patch):
+        return None
+
+    match_row = {
+        "match_id": metadata.get("matchId"),
+        "endOfGameResult": info.get("endOfGameResult"),
+        "gameDuration": info.get("gameDuration"),
+        "gameVersion": game_version
+    }
+
+    participant_rows, perk_stat_rows, perk_style_rows, perk_selection_rows = [], [], [], []
+    team_rows, objective_rows, ban_rows = [], [], []
+
+    # Participants + perks
+    for p in info["participants"]:
+        participant_row = {key: p.get(key) for key in db.PARTICIPANT_KEYS}
+        participant_row["match_id"] = metadata.get("matchId")
+        participant_row["win"] = int(p.get("win", False))
+        participant_rows.append(participant_row)
+
+        # perks
+        perks = p.get("perks", {})
+        statPerks = perks.get("statPerks", {})
+        perk_stat_rows.append({
+            "match_id": metadata.get("matchId"),
+            "puuid": p.get("puuid"),
+            "defense": statPerks.get("defense"),
+            "flex": statPerks.get("flex"),
+            "offense": statPerks.get("offense")
+        })
+
+        styles = perks.get("styles", [])
+        for idx, style in enumerate(styles):
+            style_row = {
+                "match_id": metadata.get("matchId"),
+                "puuid": p.get("puuid"),
+                "style_order": idx,
+                "style_id": style.get("style"),
+                "description": style.get("description")
+            }
+            perk_style_rows.append(style_row)
+
+            for sel in style.get("selections", []):
+                sel_row = {
+                    "match_id": metadata.get("matchId"),
+                    "puuid": p.get("puuid"),
+                    "style_order": idx,
+                    "perk_id": sel.get("perk"),
+                    "var1": sel.get("var1"),
+                    "var2": sel.get("var2"),
+                    "var3": sel.get("var3")
+                }
+                perk_selection_rows.append(sel_row)
+
+    # Teams
+    for t in info.get("teams", []):
+        team_row = {
+            "match_id": metadata.get("matchId"),
+            "team_id": t.get("teamId"),
+            "win": int(t.get("win", False))
+        }
+        team_rows.append(team_row)
+
+        for obj_name, obj_vals in t.get("objectives", {}).items():
+            objective_rows.append({
+                "match_id": metadata.get("matchId"),
+                "team_id": t.get("teamId"),
+                "objective_name": obj_name,
+                "first": obj_vals.get("first"),
+                "kills": obj_vals.get("kills")
+            })
+
+        for ban in t.get("bans", []):
+            ban_rows.append({
+                "match_id": metadata.get("matchId"),
+                "team_id": t.get("teamId"),
+                "pick_turn": ban.get("pickTurn"),
+                "champion_id": ban.get("championId")
+            })
+
+    return {
+        "matches": [match_row],
+        "participants": participant_rows,
+        "perk_stats": perk_stat_rows,
+        "perk_styles": perk_style_rows,
+        "perk_selections": perk_selection_rows,
+        "teams": team_rows,
+        "team_objectives": objective_rows,
+        "team_bans": ban_rows
+    }
+
+
+def _build_rows_or_error(args: tuple) -> tuple[dict | None, Exception | None]:
+    # Return errors instead of raising so one bad match doesn't end executor.map early
+    try:
+        return build_rows(*args), None
+    except MATCH_ERRORS as e:
+        return None, e
+
+
+def _write_bundles(cursor, built: list[tuple[str, dict]]) -> int:
+    """Write (match_id, build_rows output) pairs, keeping each match all-or-nothing. Returns matches stored."""
+    if not built:
+        return 0
+
+    cursor.execute("SAVEPOINT bundles")
     try:
-        parts = v.split(".")
-        return int(parts[0]), int(parts[1])
-    except Exception:
-        return (0, 0)
+        db.insert_match_bundles(cursor, [rows for _, rows in built])
+        return len(built)
+    except MATCH_ERRORS:
+        cursor.execute("ROLLBACK TO bundles")
+    finally:
+        cursor.execute("RELEASE bundles")
+
+    # One bad match fails the whole batch; retry one at a time so only that match is dropped
+    stored = 0
+    for match_id, rows in built:
+        cursor.execute("SAVEPOINT match")
+        try:
+            db.insert_match_bundle(cursor, rows)
+            stored += 1
+        except MATCH_ERRORS as e:
+            # Undo this match's partial rows so matches are only ever stored whole
+            cursor.execute("ROLLBACK TO match")
+            log.warning("Error processing match %s: %r", match_id, e)
+        finally:
+            cursor.execute("RELEASE match")
+    return stored
 
 
 def clean_matches_from_db(
         raw_db_path: str, 
         clean_db_path: str,
         min_duration: int|None = None,
-        min_patch: str|None = None
+        min_patch: str|None = None,
+        commit_every: int = 1000,
+        workers: int|None = None,
+        batch_size: int = 1000,
+        insert_every: int = 100
         ):
     """
     Clean a database containing raw match data JSONs into a clean database.
@@ -24,6 +189,10 @@ def clean_matches_from_db(
         clean_db_path (str): Path to pre-existing database or database that will be created for clean match data.
         min_duration (str, optional): Minimum time in seconds a match must last to be used for analysis. Defaults to None.
         min_patch (str, optional): Minimum patch a match must be to used for analysis. Defaults to None.
+        commit_every (int, optional): Number of cleaned matches written per transaction. Defaults to 1000.
+        workers (int, optional): Worker processes used to parse raw JSON; None or 1 parses in this process. Defaults to None.
+        batch_size (int, optional): Number of raw matches read from the raw DB at a time. Defaults to 1000.
+        insert_every (int, optional): Number of cleaned matches written together with one executemany per table. Defaults to 100.
     """
     raw_conn = db.connect(raw_db_path)
     clean_conn = db.connect(clean_db_path)
@@ -32,164 +201,103 @@ def clean_matches_from_db(
     # make sure clean tables exist
     db.create_clean_matches_table(clean_conn)
 
+    db.tune_for_bulk_load(clean_conn)
+    # Transactions are managed by hand: one per commit_every matches, a savepoint per write
+    clean_conn.isolation_level = None
+    clean_cursor.execute("BEGIN")
+    uncommitted = 0
+
     raw_cursor = raw_conn.cursor()
-    raw_cursor.execute("SELECT match_id, data FROM raw_matches")
-    matches = raw_cursor.fetchall()
 
-    total_matches = len(matches)
+    # One query up front instead of a lookup per raw match
+    cleaned_ids = {row[0] for row in clean_cursor.execute("SELECT match_id FROM matches")}
+
+    total_matches = raw_cursor.execute("SELECT COUNT(*) FROM raw_matches").fetchone()[0]
     processed = 0
     successful_clean = 0
     skipped_match = 0
 
-    for match_id, raw_data in matches:
-        # Show progress
-        processed += 1
-        print("\r" + " " * 120, end="", flush=True)  # clear line
-        print(f"\rProcessing match {processed}/{total_matches} | Successful cleans: {successful_clean} | Skipped matches: {skipped_match}", end="", flush=True)        
+    progress = Progress()
 
-        # skip if match already in clean DB
-        clean_cursor.execute("SELECT 1 FROM matches WHERE match_id = ?", (match_id,))
-        if clean_cursor.fetchone():
-            skipped_match += 1
-            continue
+    # Drop short matches in SQL so their JSON never reaches Python. Rows that are not valid JSON
+    # or have no duration are kept so build_rows reports them as errors like before; CASE only
+    # evaluates its taken branch, so json_extract never sees malformed data (which would abort the query)
+    if min_duration:
+        raw_cursor.execute(
+            """
+            SELECT match_id, gameVersion, data FROM raw_matches
+            WHERE CASE WHEN json_valid(data)
+                       THEN IFNULL(json_extract(data, '$.info.gameDuration') >= ?, 1)
+                       ELSE 1
+                  END
+            """,
+            (min_duration,)
+        )
+    else:
+        raw_cursor.execute("SELECT match_id, gameVersion, data FROM raw_matches")
+    min_version = version_to_tuple(min_patch) if min_patch else None
+    executor = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    built = []  # (match_id, build_rows output) waiting to be written
+    try:
+        # Stream rows in batches so only one batch of raw JSON blobs is held at a time
+        while batch := raw_cursor.fetchmany(batch_size):
+            # skip if match already in clean DB or, from the stored gameVersion column, below min_patch
+            pending = [
+                (match_id, raw_data) for match_id, game_version, raw_data in batch
+                if match_id not in cleaned_ids
+                and not (min_version and version_to_tuple(game_version) < min_version)
+            ]
+            prefiltered = len(batch) - len(pending)
+            processed += prefiltered
+            skipped_match += prefiltered
 
-        try:
-            match_json = json.loads(raw_data)
-            metadata = match_json["metadata"]
-            info = match_json["info"]
+            args = [(raw_data, min_duration, min_patch) for _, raw_data in pending]
+            if executor:
+                results = executor.map(_build_rows_or_error, args, chunksize=64)
+            else:
+                results = map(_build_rows_or_error, args)
 
-            if min_duration and info.get("gameDuration") < min_duration:
-                skipped_match += 1
-                continue
+            # Results come back in order; all writes stay on this process (SQLite has one writer)
+            for (match_id, _), (rows, error) in zip(pending, results):
+                # Show progress
+                processed += 1
+                if progress.due(processed):
+                    progress.show(f"Processing match {processed}/{total_matches} | Successful cleans: {successful_clean} | Skipped matches: {skipped_match}", processed)
 
-            game_version = ".".join(info.get("gameVersion", "").split(".")[:2])
-            if min_patch and version_to_tuple(game_version) < version_to_tuple(min_patch):
-                skipped_match += 1
-                continue
+                if error is None and rows is None:
+                    skipped_match += 1
+                    continue
 
-            # Insert match row
-            match_row = {
-                "match_id": metadata.get("matchId"),
-                "endOfGameResult": info.get("endOfGameResult"),
-                "gameDuration": info.get("gameDuration"),
-                "gameVersion": ".".join(info.get("gameVersion", "").split(".")[:2])
-            }
-            db.insert_match(clean_cursor, match_row)
+                if error is not None:
+                    log.warning("Error processing match %s: %r", match_id, error)
+                    continue
 
-            # Participants + perks
-            for p in info["participants"]:
-                participant_row = {
-                    "match_id": metadata.get("matchId"),
-                    "puuid": p.get("puuid"),
-                    "championName": p.get("championName"),
-                    "teamId": p.get("teamId"),
-                    "teamPosition": p.get("teamPosition"),
-                    "kills": p.get("kills"),
-                    "deaths": p.get("deaths"),
-                    "assists": p.get("assists"),
-                    "win": int(p.get("win", False)),
-                    "totalDamageDealt": p.get("totalDamageDealt"),
-                    "totalDamageDealtToChampions": p.get("totalDamageDealtToChampions"),
-                    "physicalDamageDealt": p.get("physicalDamageDealt"),
-                    "physicalDamageDealtToChampions": p.get("physicalDamageDealtToChampions"),
-                    "magicDamageDealt": p.get("magicDamageDealt"),
-                    "magicDamageDealtToChampions": p.get("magicDamageDealtToChampions"),
-                    "trueDamageDealt": p.get("trueDamageDealt"),
-                    "trueDamageDealtToChampions": p.get("trueDamageDealtToChampions"),
-                    "totalHeal": p.get("totalHeal"),
-                    "totalHealsOnTeammates": p.get("totalHealsOnTeammates"),
-                    "damageSelfMitigated": p.get("damageSelfMitigated"),
-                    "totalTimeCrowdControlDealt": p.get("totalTimeCrowdControlDealt"),
-                    "longestTimeSpentLiving": p.get("longestTimeSpentLiving"),
-                    "totalMinionsKilled": p.get("totalMinionsKilled"),
-                    "neutralMinionsKilled": p.get("neutralMinionsKilled"),
-                    "turretKills": p.get("turretKills"),
-                    "inhibitorKills": p.get("inhibitorKills"),
-                    "dragonKills": p.get("dragonKills"),
-                    "baronKills": p.get("baronKills"),
-                    "spell1Casts": p.get("spell1Casts"),
-                    "spell2Casts": p.get("spell2Casts"),
-                    "spell3Casts": p.get("spell3Casts"),
-                    "spell4Casts": p.get("spell4Casts"),
-                    "summoner1Id": p.get("summoner1Id"),
-                    "summoner2Id": p.get("summoner2Id"),
-                    "playerAugment1": p.get("playerAugment1"),
-                    "playerAugment2": p.get("playerAugment2"),
-                    "playerAugment3": p.get("playerAugment3"),
-                    "playerAugment4": p.get("playerAugment4")
-                }
-                db.insert_participant(clean_cursor, participant_row)
+                built.append((match_id, rows))
+                if len(built) >= insert_every:
+                    stored = _write_bundles(clean_cursor, built)
+                    successful_clean += stored
+                    skipped_match += len(built) - stored
+                    uncommitted += stored
+                    built.clear()
 
-                # perks
-                perks = p.get("perks", {})
-                statPerks = perks.get("statPerks", {})
-                db.insert_perk_stats(clean_cursor, {
-                    "match_id": metadata.get("matchId"),
-                    "puuid": p.get("puuid"),
-                    "defense": statPerks.get("defense"),
-                    "flex": statPerks.get("flex"),
-                    "offense": statPerks.get("offense")
-                })
-
-                styles = perks.get("styles", [])
-                for idx, style in enumerate(styles):
-                    style_row = {
-                        "match_id": metadata.get("matchId"),
-                        "puuid": p.get("puuid"),
-                        "style_order": idx,
-                        "style_id": style.get("style"),
-                        "description": style.get("description")
-                    }
-                    db.insert_perk_style(clean_cursor, style_row)
-
-                    for sel in style.get("selections", []):
-                        sel_row = {
-                            "match_id": metadata.get("matchId"),
-                            "puuid": p.get("puuid"),
-                            "style_order": idx,
-                            "perk_id": sel.get("perk"),
-                            "var1": sel.get("var1"),
-                            "var2": sel.get("var2"),
-                            "var3": sel.get("var3")
-                        }
-                        db.insert_perk_selection(clean_cursor, sel_row)
-
-            # Teams
-            for t in info.get("teams", []):
-                team_row = {
-                    "match_id": metadata.get("matchId"),
-                    "team_id": t.get("teamId"),
-                    "win": int(t.get("win", False))
-                }
-                db.insert_team(clean_cursor, team_row)
-
-                for obj_name, obj_vals in t.get("objectives", {}).items():
-                    db.insert_team_objective(clean_cursor, {
-                        "match_id": metadata.get("matchId"),
-                        "team_id": t.get("teamId"),
-                        "objective_name": obj_name,
-                        "first": obj_vals.get("first"),
-                        "kills": obj_vals.get("kills")
-                    })
-
-                for ban in t.get("bans", []):
-                    db.insert_team_ban(clean_cursor, {
-                        "match_id": metadata.get("matchId"),
-                        "team_id": t.get("teamId"),
-                        "pick_turn": ban.get("pickTurn"),
-                        "champion_id": ban.get("championId")
-                    })
-
-            # Commit per match for safety
-            successful_clean += 1
-            clean_conn.commit()
-
-        except Exception as e:
-            print(f"\nError processing match {match_id}: {e}")
-            continue
-
-    print("\r" + " " * 120, end="", flush=True)  # clear line
-    print(f"\rProcessing match {processed}/{total_matches} | Successful cleans: {successful_clean} | Skipped matches: {skipped_match}", end="", flush=True)    
+                if uncommitted >= commit_every:
+                    clean_cursor.execute("COMMIT")
+                    clean_cursor.execute("BEGIN")
+                    uncommitted = 0
+
+        stored = _write_bundles(clean_cursor, built)
+        successful_clean += stored
+        skipped_match += len(built) - stored
+    finally:
+        if executor:
+            executor.shutdown()
+
+    clean_cursor.execute("COMMIT")
+
+    # Matches dropped by the SQL duration filter never reached the loop
+    skipped_match += total_matches - processed
+    processed = total_matches
+    progress.show(f"Processing match {processed}/{total_matches} | Successful cleans: {successful_clean} | Skipped matches: {skipped_match}")
 
     raw_conn.close()
     clean_conn.close()
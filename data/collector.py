@@ -2,9 +2,11 @@
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from api.riot_client import RiotAPIClient
-from .database import connect, create_raw_matches_table, match_exists, insert_raw_match, delete_old_patches
-from api.endpoints import get_ladder, get_match_history, get_match_data_from_id
+from .database import version_to_tuple, connect, tune_for_bulk_load, create_raw_matches_table, add_raw_matches, delete_old_patches
+from .progress import Progress
+from api.endpoints import get_ladder, get_all_match_history, get_match_data_from_id
 
 
 def collect_matches(
@@ -17,11 +19,14 @@ def collect_matches(
     match_queue: int = 420,
     match_region: str = "americas",
     match_type: str = "ranked",
-    min_patch: str|None = None
+    min_patch: str|None = None,
+    max_workers: int = 8,
+    insert_every: int = 100
 ):
     """
-    Collect raw match data for a list of players, appending each new match as JSON to jsonl_path.
-    Deduplicates using match_id. Writes immediately after each successful fetch.
+    Collect raw match data for a list of players, appending each new match as JSON to the raw_matches table.
+    Gathers every player's match history first, then fetches each unique new match_id exactly once.
+    Writes fetched matches in batches of insert_every, one commit per batch.
 
     Args:
         client (RiotAPIClient): Client to access Riot API.
@@ -34,8 +39,11 @@ def collect_matches(
         match_region (str, optional): Region for match collection. Defaults to "americas".
         match_type (str, optional): Type for match collection. Defaults to "ranked"
         min_patch (str, optional): Minimum patch to keep in DB. e.g. "15.15". Defaults to None.
+        max_workers (int, optional): Number of match detail requests allowed in flight at once. Defaults to 8.
+        insert_every (int, optional): Number of fetched matches written per commit. Defaults to 100.
     """
     conn = connect(db_path)
+    tune_for_bulk_load(conn)
     create_raw_matches_table(conn=conn)
 
     # Delete old patches before collecting
@@ -48,46 +56,69 @@ def collect_matches(
 
     player_puuids = get_ladder(client=client, region=ladder_region, top=top, queue=ladder_queue)["puuid"].dropna().tolist()
 
-    def parse_version(v: str) -> tuple[int, int]:
-        parts = v.split(".")
-        try:
-            return int(parts[0]), int(parts[1])
-        except (ValueError, IndexError):
-            return (0, 0)
-        
-    keep_major, keep_minor = parse_version(min_patch) if min_patch else (0, 0)
+    keep_version = version_to_tuple(min_patch) if min_patch else (0, 0)
 
+    def fetch(match_id: str) -> dict | None:
+        return get_match_data_from_id(client=client, match_id=match_id, region=match_region)
+
+    # One query up front instead of a match_exists lookup per candidate id
+    stored_ids = {row[0] for row in conn.execute("SELECT match_id FROM raw_matches")}
+
+    # Pass 1: gather every player's history first; top players share lobbies, so ids overlap heavily
+    pending_ids = {}
+    progress = Progress(pipe_every=50)
     for player_idx, puuid in enumerate(player_puuids):
-        match_ids = get_match_history(client=client, puuid=puuid, region=match_region, count=matches_per_player, queue=match_queue, type=match_type)
+        if progress.due(player_idx + 1):
+            progress.show(f"Player {player_idx+1}/{len(player_puuids)} | Match ids found: {len(pending_ids)}", player_idx + 1)
+
+        match_ids = get_all_match_history(client=client, puuid=puuid, total=matches_per_player, region=match_region, queue=match_queue, type=match_type)
         if not match_ids:
             continue
 
-        for match_idx, match_id in enumerate(match_ids):
-            print("\r" + " " * 250, end="", flush=True)
-            print(f"\rPlayer {player_idx+1}/{len(player_puuids)} | Match {match_idx+1}/{len(match_ids)} | New matches: {new_matches_count} | Old games skipped: {old_games_skipped}", end="")
+        # Skip if match_id exists in db or was already listed by another player
+        for match_id in match_ids:
+            if match_id not in pending_ids and match_id not in stored_ids:
+                pending_ids[match_id] = None
+    progress.show(f"Player {len(player_puuids)}/{len(player_puuids)} | Match ids found: {len(pending_ids)}")
+    print()
 
-            # Skip if match_id exists in db
-            if match_exists(conn, match_id):
-                continue
+    # Pass 2: fetch each unique new match exactly once
+    new_ids = list(pending_ids)
+    progress = Progress(pipe_every=500)
 
-            raw_match = get_match_data_from_id(client=client, match_id=match_id, region=match_region)
-            if not raw_match:
-                continue
+    batch = []
+    try:
+        # Match details are fetched concurrently; the client's RateLimiter keeps the pool within Riot's limits
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map() yields in submission order, so inserts stay on this thread and in history order
+            for match_idx, raw_match in enumerate(executor.map(fetch, new_ids)):
+                if progress.due(match_idx + 1):
+                    progress.show(f"Match {match_idx+1}/{len(new_ids)} | New matches: {new_matches_count} | Old games skipped: {old_games_skipped}", match_idx + 1)
 
-            # Skip if gameVersion is below min_patch
-            if min_patch:
-                game_version = raw_match.get("info", {}).get("gameVersion", "")
-                major, minor = parse_version(game_version)
-                if (major, minor) < (keep_major, keep_minor):
-                    old_games_skipped += 1
+                if not raw_match:
                     continue
 
-            # Insert raw JSON into SQL
-            insert_raw_match(conn, raw_match)
-            new_matches_count += 1
-
-    print("\r" + " " * 250, end="", flush=True)
-    print(f"\rPlayer {player_idx+1}/{len(player_puuids)} | Match {match_idx+1}/{len(match_ids)} | New matches: {new_matches_count} | Old games skipped: {old_games_skipped}", end="")
+                # Skip if gameVersion is below min_patch
+                if min_patch:
+                    game_version = raw_match.get("info", {}).get("gameVersion", "")
+                    if version_to_tuple(game_version) < keep_version:
+                        old_games_skipped += 1
+                        continue
+
+                # Insert raw JSON into SQL
+                batch.append(raw_match)
+                new_matches_count += 1
+                if len(batch) >= insert_every:
+                    add_raw_matches(conn, batch)
+                    conn.commit()
+                    batch.clear()
+    finally:
+        # Flush the last partial batch, including when the run is interrupted
+        if batch:
+            add_raw_matches(conn, batch)
+        conn.commit()
+
+    progress.show(f"Match {len(new_ids)}/{len(new_ids)} | New matches: {new_matches_count} | Old games skipped: {old_games_skipped}")
     conn.close()
     print()
 
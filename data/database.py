@@ -1,11 +1,41 @@
 import sqlite3
-import json
+from functools import lru_cache
+from api.json_utils import _json_dumps
+
+# Raw-table statements, shared so sqlite3's per-connection statement cache is hit on every call
+_MATCH_EXISTS_SQL = "SELECT 1 FROM raw_matches WHERE match_id = ? LIMIT 1"
+_INSERT_RAW_MATCH_SQL = "INSERT OR IGNORE INTO raw_matches (match_id, gameVersion, data) VALUES (?, ?, ?)"
+
+# Cached: there are only a few dozen distinct patches
+@lru_cache(maxsize=512)
+def version_to_tuple(v: str) -> tuple[int, int]:
+    """Convert '15.14' -> (15, 14) for comparison; bad/missing versions count as very old."""
+    try:
+        major, _, rest = v.partition(".")
+        minor, _, _ = rest.partition(".")
+        return int(major), int(minor)
+    except Exception:
+        return (0, 0)
 
 def connect(db_path: str):
     """Connect to SQLite DB (creates file if not exists)."""
     conn = sqlite3.connect(db_path)
     return conn
 
+def tune_for_bulk_load(conn):
+    """
+    Set pragmas for a long bulk write on this connection.
+    WAL with NORMAL sync avoids a full fsync on every commit; the larger
+    page cache and in-memory temp store keep the B-tree working set resident.
+    """
+    conn.executescript("""
+                       PRAGMA journal_mode=WAL;
+                       PRAGMA synchronous=NORMAL;
+                       PRAGMA temp_store=MEMORY;
+                       PRAGMA cache_size=-262144;
+                       PRAGMA mmap_size=268435456;
+                       """)
+
 def create_raw_matches_table(conn):
     """Ensure raw_matches table exists."""
     cursor = conn.cursor()
@@ -16,6 +46,8 @@ def create_raw_matches_table(conn):
                    data TEXT NOT NULL
                    )
                    """)
+    # delete_old_patches reads distinct versions and deletes by version
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_raw_matches_gameVersion ON raw_matches (gameVersion)")
     conn.commit()
     
     return
@@ -24,27 +56,41 @@ def match_exists(conn, match_id: str) -> bool:
     """Check if a match ID is already in the raw_matches table."""
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT 1 FROM raw_matches WHERE match_id = ?", (match_id,))
+        cursor.execute(_MATCH_EXISTS_SQL, (match_id,))
     except sqlite3.OperationalError:
         # Table doesn't exist yet → treat as not found
         return False
     return cursor.fetchone() is not None
 
 def insert_raw_match(conn, raw_match: dict):
-    """Insert raw JSON match data into the DB."""
-    cursor = conn.cursor()
-    match_id = raw_match.get("metadata", {}).get("matchId")
-    game_version = raw_match.get("info", {}).get("gameVersion")
-    if not match_id or not game_version:
-        return
-    cursor.execute(
-        "INSERT OR IGNORE INTO raw_matches (match_id, gameVersion, data) VALUES (?, ?, ?)",
-        (match_id, game_version, json.dumps(raw_match))
-    )
+    """Insert raw JSON match data into the DB and commit."""
+    insert_raw_matches(conn, [raw_match])
+
+    return
+
+def insert_raw_matches(conn, raw_matches: list[dict]):
+    """Insert several raw JSON matches with one executemany, then commit once."""
+    add_raw_matches(conn, raw_matches)
     conn.commit()
 
     return
 
+def add_raw_matches(conn, raw_matches: list[dict]):
+    """
+    Insert several raw JSON matches with one executemany, without committing.
+    The caller must commit (or roll back); this lets many batches share a transaction.
+    """
+    rows = []
+    for raw_match in raw_matches:
+        match_id = raw_match.get("metadata", {}).get("matchId")
+        game_version = raw_match.get("info", {}).get("gameVersion")
+        if not match_id or not game_version:
+            continue
+        rows.append((match_id, game_version, _json_dumps(raw_match)))
+    conn.executemany(_INSERT_RAW_MATCH_SQL, rows)
+
+    return
+
 def delete_old_patches(conn, min_version: str):
     """
     Delete all raw_matches older than the given patch version.
@@ -52,26 +98,14 @@ def delete_old_patches(conn, min_version: str):
     """
     cursor = conn.cursor()
 
-    # Convert versions to their numeric components for comparison
-    def parse_version(v: str) -> tuple[int, int]:
-        parts = v.split(".")
-        try:
-            return int(parts[0]), int(parts[1])
-        except (ValueError, IndexError):
-            return (0, 0)  # treat bad/missing version as very old
-
     # Get all unique versions in DB
     cursor.execute("SELECT DISTINCT gameVersion FROM raw_matches")
     versions = [row[0] for row in cursor.fetchall()]
 
-    keep_major, keep_minor = parse_version(min_version)
+    keep_version = version_to_tuple(min_version)
 
     # Build list of versions to delete
-    to_delete = []
-    for v in versions:
-        major, minor = parse_version(v)
-        if (major, minor) < (keep_major, keep_minor):
-            to_delete.append(v)
+    to_delete = [v for v in versions if version_to_tuple(v) < keep_version]
 
     if to_delete:
         cursor.executemany(
@@ -83,156 +117,176 @@ def delete_old_patches(conn, min_version: str):
     else:
         print("No old patches to delete.")
 
-def create_clean_matches_table(conn):
-    """Ensures clean table exists"""
-    cursor = conn.cursor()
+# Clean schema, run as one script. participants stays a rowid table because its rows are wide
+_CLEAN_SCHEMA_DDL = """
+    CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    endOfGameResult TEXT,
+    gameDuration INT,
+    gameVersion TEXT
+    ) WITHOUT ROWID;
 
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS matches (
-                   match_id TEXT PRIMARY KEY,
-                   endOfGameResult TEXT,
-                   gameDuration INT,
-                   gameVersion TEXT
-                   )
-                   """)
+    CREATE TABLE IF NOT EXISTS participants (
+    match_id TEXT NOT NULL,
+    puuid TEXT NOT NULL,
+    championName TEXT,
+    teamId INT,
+    teamPosition TEXT,
+    kills INT,
+    deaths INT,
+    assists INT,
+    win INT,
 
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS participants (
-                   match_id TEXT NOT NULL,
-                   puuid TEXT NOT NULL,
-                   championName TEXT,
-                   teamId INT,
-                   teamPosition TEXT,
-                   kills INT,
-                   deaths INT,
-                   assists INT,
-                   win INT,
-
-                   -- Damage breakdown
-                   totalDamageDealt INT,
-                   totalDamageDealtToChampions INT,
-                   physicalDamageDealt INT,
-                   physicalDamageDealtToChampions INT,
-                   magicDamageDealt INT,
-                   magicDamageDealtToChampions INT,
-                   trueDamageDealt INT,
-                   trueDamageDealtToChampions INT,
-                   
-                   -- Healing and mitigation
-                   totalHeal INT,
-                   totalHealsOnTeammates INT,
-                   damageSelfMitigated INT,
-
-                   -- Crowd control
-                   totalTimeCrowdControlDealt INT,
-                   longestTimeSpentLiving INT,
-
-                   -- Objectives and minions
-                   totalMinionsKilled INT,
-                   neutralMinionsKilled INT,
-                   turretKills INT,
-                   inhibitorKills INT,
-                   dragonKills INT,
-                   baronKills INT,
-
-                   -- Spells and summoner
-                   spell1Casts INT,
-                   spell2Casts INT,
-                   spell3Casts INT,
-                   spell4Casts INT,
-                   summoner1Id INT,
-                   summoner2Id INT,
-
-                   -- Player Augments
-                   playerAugment1 INT,
-                   playerAugment2 INT,
-                   playerAugment3 INT,
-                   playerAugment4 INT,
-
-                   PRIMARY KEY (match_id, puuid),
-                   FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
-                   )
-                   """)
-    
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS perk_stats(
-                   match_id TEXT NOT NULL,
-                   puuid TEXT NOT NULL,
-                   defense INT,
-                   flex INT,
-                   offense INT,
-                   PRIMARY KEY (match_id, puuid),
-                   FOREIGN KEY (match_id, puuid) REFERENCES participants(match_id, puuid) ON DELETE CASCADE
-                   )
-                   """)
-    
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS perk_styles(
-                   match_id TEXT NOT NULL,
-                   puuid TEXT NOT NULL,
-                   style_order INT NOT NULL,
-                   style_id INT NOT NULL,
-                   description TEXT,
-                   PRIMARY KEY (match_id, puuid, style_order),
-                   FOREIGN KEY (match_id, puuid) REFERENCES participants(match_id, puuid) ON DELETE CASCADE
-                   )
-                   """)
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS perk_selections(
-                   match_id TEXT NOT NULL,
-                   puuid TEXT NOT NULL,
-                   style_order INT NOT NULL,
-                   perk_id INT NOT NULL,
-                   var1 INT,
-                   var2 INT,
-                   var3 INT,
-                   PRIMARY KEY (match_id, puuid, style_order, perk_id),
-                   FOREIGN KEY (match_id, puuid, style_order) REFERENCES perk_styles(match_id, puuid, style_order) ON DELETE CASCADE
-                   )
-                   """)
-    
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS teams(
-                   match_id TEXT NOT NULL,
-                   team_id INT NOT NULL,
-                   win INT,
-                   PRIMARY KEY (match_id, team_id),
-                   FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
-                   )
-                   """)
-    
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS team_objectives(
-                   match_id TEXT NOT NULL,
-                   team_id INT NOT NULL,
-                   objective_name TEXT NOT NULL,
-                   first INT,
-                   kills INT,
-                   PRIMARY KEY (match_id, team_id, objective_name),
-                   FOREIGN KEY (match_id, team_id) REFERENCES teams(match_id, team_id) ON DELETE CASCADE
-                   )
-                   """)
-    
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS team_bans(
-                   match_id TEXT NOT NULL,
-                   team_id INT NOT NULL,
-                   pick_turn INT NOT NULL,
-                   champion_id INT,
-                   PRIMARY KEY (match_id, team_id, pick_turn),
-                   FOREIGN KEY (match_id, team_id) REFERENCES teams(match_id, team_id) ON DELETE CASCADE
-                   )
-                   """)
-    conn.commit()
+    -- Damage breakdown
+    totalDamageDealt INT,
+    totalDamageDealtToChampions INT,
+    physicalDamageDealt INT,
+    physicalDamageDealtToChampions INT,
+    magicDamageDealt INT,
+    magicDamageDealtToChampions INT,
+    trueDamageDealt INT,
+    trueDamageDealtToChampions INT,
+
+    -- Healing and mitigation
+    totalHeal INT,
+    totalHealsOnTeammates INT,
+    damageSelfMitigated INT,
+
+    -- Crowd control
+    totalTimeCrowdControlDealt INT,
+    longestTimeSpentLiving INT,
+
+    -- Objectives and minions
+    totalMinionsKilled INT,
+    neutralMinionsKilled INT,
+    turretKills INT,
+    inhibitorKills INT,
+    dragonKills INT,
+    baronKills INT,
+
+    -- Spells and summoner
+    spell1Casts INT,
+    spell2Casts INT,
+    spell3Casts INT,
+    spell4Casts INT,
+    summoner1Id INT,
+    summoner2Id INT,
+
+    -- Player Augments
+    playerAugment1 INT,
+    playerAugment2 INT,
+    playerAugment3 INT,
+    playerAugment4 INT,
+
+    PRIMARY KEY (match_id, puuid),
+    FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS perk_stats(
+    match_id TEXT NOT NULL,
+    puuid TEXT NOT NULL,
+    defense INT,
+    flex INT,
+    offense INT,
+    PRIMARY KEY (match_id, puuid),
+    FOREIGN KEY (match_id, puuid) REFERENCES participants(match_id, puuid) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS perk_styles(
+    match_id TEXT NOT NULL,
+    puuid TEXT NOT NULL,
+    style_order INT NOT NULL,
+    style_id INT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (match_id, puuid, style_order),
+    FOREIGN KEY (match_id, puuid) REFERENCES participants(match_id, puuid) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS perk_selections(
+    match_id TEXT NOT NULL,
+    puuid TEXT NOT NULL,
+    style_order INT NOT NULL,
+    perk_id INT NOT NULL,
+    var1 INT,
+    var2 INT,
+    var3 INT,
+    PRIMARY KEY (match_id, puuid, style_order, perk_id),
+    FOREIGN KEY (match_id, puuid, style_order) REFERENCES perk_styles(match_id, puuid, style_order) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS teams(
+    match_id TEXT NOT NULL,
+    team_id INT NOT NULL,
+    win INT,
+    PRIMARY KEY (match_id, team_id),
+    FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS team_objectives(
+    match_id TEXT NOT NULL,
+    team_id INT NOT NULL,
+    objective_name TEXT NOT NULL,
+    first INT,
+    kills INT,
+    PRIMARY KEY (match_id, team_id, objective_name),
+    FOREIGN KEY (match_id, team_id) REFERENCES teams(match_id, team_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS team_bans(
+    match_id TEXT NOT NULL,
+    team_id INT NOT NULL,
+    pick_turn INT NOT NULL,
+    champion_id INT,
+    PRIMARY KEY (match_id, team_id, pick_turn),
+    FOREIGN KEY (match_id, team_id) REFERENCES teams(match_id, team_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    -- (match_id, puuid) primary key already serves per-match lookups; this serves per-player ones
+    CREATE INDEX IF NOT EXISTS idx_participants_puuid ON participants (puuid);
+"""
+
+def create_clean_matches_table(conn):
+    """Ensures clean table exists"""
+    conn.executescript(_CLEAN_SCHEMA_DDL)
 
     return
 
 # --- insert functions ---
+# participants columns taken straight from the Riot participant payload (match_id aside)
+PARTICIPANT_KEYS = (
+    "puuid", "championName", "teamId", "teamPosition", "kills", "deaths", "assists", "win",
+    "totalDamageDealt", "totalDamageDealtToChampions", "physicalDamageDealt", "physicalDamageDealtToChampions",
+    "magicDamageDealt", "magicDamageDealtToChampions", "trueDamageDealt", "trueDamageDealtToChampions",
+    "totalHeal", "totalHealsOnTeammates", "damageSelfMitigated", "totalTimeCrowdControlDealt", "longestTimeSpentLiving",
+    "totalMinionsKilled", "neutralMinionsKilled", "turretKills", "inhibitorKills", "dragonKills", "baronKills",
+    "spell1Casts", "spell2Casts", "spell3Casts", "spell4Casts", "summoner1Id", "summoner2Id",
+    "playerAugment1", "playerAugment2", "playerAugment3", "playerAugment4"
+)
+
+# Column order for every other table; each insert statement is built once at import
+MATCH_KEYS = ("match_id", "endOfGameResult", "gameDuration", "gameVersion")
+PERK_STATS_KEYS = ("match_id", "puuid", "defense", "flex", "offense")
+PERK_STYLE_KEYS = ("match_id", "puuid", "style_order", "style_id", "description")
+PERK_SELECTION_KEYS = ("match_id", "puuid", "style_order", "perk_id", "var1", "var2", "var3")
+TEAM_KEYS = ("match_id", "team_id", "win")
+TEAM_OBJECTIVE_KEYS = ("match_id", "team_id", "objective_name", "first", "kills")
+TEAM_BAN_KEYS = ("match_id", "team_id", "pick_turn", "champion_id")
+_PARTICIPANT_COLUMNS = ("match_id",) + PARTICIPANT_KEYS
+
+def _insert_sql(table: str, keys: tuple) -> str:
+    return f"INSERT OR IGNORE INTO {table} ({', '.join(keys)}) VALUES ({', '.join(['?'] * len(keys))})"
+
+_INSERT_MATCH_SQL = _insert_sql("matches", MATCH_KEYS)
+_INSERT_PARTICIPANTS_SQL = _insert_sql("participants", _PARTICIPANT_COLUMNS)
+_INSERT_PERK_STATS_SQL = _insert_sql("perk_stats", PERK_STATS_KEYS)
+_INSERT_PERK_STYLES_SQL = _insert_sql("perk_styles", PERK_STYLE_KEYS)
+_INSERT_PERK_SELECTIONS_SQL = _insert_sql("perk_selections", PERK_SELECTION_KEYS)
+_INSERT_TEAMS_SQL = _insert_sql("teams", TEAM_KEYS)
+_INSERT_TEAM_OBJECTIVES_SQL = _insert_sql("team_objectives", TEAM_OBJECTIVE_KEYS)
+_INSERT_TEAM_BANS_SQL = _insert_sql("team_bans", TEAM_BAN_KEYS)
+
 def insert_match(cursor, match_data: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO matches (match_id, endOfGameResult, gameDuration, gameVersion)
-        VALUES (?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_MATCH_SQL, (
         match_data["match_id"],
         match_data.get("endOfGameResult"),
         match_data.get("gameDuration"),
@@ -240,26 +294,11 @@ def insert_match(cursor, match_data: dict):
     ))
 
 def insert_participant(cursor, participant_data: dict):
-    keys = (
-        "match_id", "puuid", "championName", "teamId", "teamPosition", "kills", "deaths", "assists", "win",
-        "totalDamageDealt", "totalDamageDealtToChampions", "physicalDamageDealt", "physicalDamageDealtToChampions",
-        "magicDamageDealt", "magicDamageDealtToChampions", "trueDamageDealt", "trueDamageDealtToChampions",
-        "totalHeal", "totalHealsOnTeammates", "damageSelfMitigated", "totalTimeCrowdControlDealt", "longestTimeSpentLiving",
-        "totalMinionsKilled", "neutralMinionsKilled", "turretKills", "inhibitorKills", "dragonKills", "baronKills",
-        "spell1Casts", "spell2Casts", "spell3Casts", "spell4Casts", "summoner1Id", "summoner2Id",
-        "playerAugment1", "playerAugment2", "playerAugment3", "playerAugment4"
-    )
-    values = tuple(participant_data.get(k) for k in keys)
-    cursor.execute(f"""
-        INSERT OR IGNORE INTO participants ({', '.join(keys)})
-        VALUES ({', '.join(['?'] * len(keys))})
-    """, values)
+    values = tuple(participant_data.get(k) for k in _PARTICIPANT_COLUMNS)
+    cursor.execute(_INSERT_PARTICIPANTS_SQL, values)
 
 def insert_perk_stats(cursor, perk_stats: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO perk_stats (match_id, puuid, defense, flex, offense)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_PERK_STATS_SQL, (
         perk_stats["match_id"],
         perk_stats["puuid"],
         perk_stats.get("defense"),
@@ -268,10 +307,7 @@ def insert_perk_stats(cursor, perk_stats: dict):
     ))
 
 def insert_perk_style(cursor, style: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO perk_styles (match_id, puuid, style_order, style_id, description)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_PERK_STYLES_SQL, (
         style["match_id"],
         style["puuid"],
         style["style_order"],
@@ -280,10 +316,7 @@ def insert_perk_style(cursor, style: dict):
     ))
 
 def insert_perk_selection(cursor, selection: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO perk_selections (match_id, puuid, style_order, perk_id, var1, var2, var3)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_PERK_SELECTIONS_SQL, (
         selection["match_id"],
         selection["puuid"],
         selection["style_order"],
@@ -294,20 +327,14 @@ def insert_perk_selection(cursor, selection: dict):
     ))
 
 def insert_team(cursor, team: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO teams (match_id, team_id, win)
-        VALUES (?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_TEAMS_SQL, (
         team["match_id"],
         team["team_id"],
         team.get("win")
     ))
 
 def insert_team_objective(cursor, objective: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO team_objectives (match_id, team_id, objective_name, first, kills)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_TEAM_OBJECTIVES_SQL, (
         objective["match_id"],
         objective["team_id"],
         objective["objective_name"],
@@ -316,12 +343,63 @@ def insert_team_objective(cursor, objective: dict):
     ))
 
 def insert_team_ban(cursor, ban: dict):
-    cursor.execute("""
-        INSERT OR IGNORE INTO team_bans (match_id, team_id, pick_turn, champion_id)
-        VALUES (?, ?, ?, ?)
-    """, (
+    cursor.execute(_INSERT_TEAM_BANS_SQL, (
         ban["match_id"],
         ban["team_id"],
         ban["pick_turn"],
         ban.get("champion_id")
-    ))
\ No newline at end of file
+    ))
+
+# --- batched insert functions ---
+# Each takes a list of row dicts (same keys as the single-row functions) and issues one executemany
+def _values(keys: tuple, rows: list[dict]) -> list[tuple]:
+    return [tuple(row.get(k) for k in keys) for row in rows]
+
+def insert_participants_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_PARTICIPANTS_SQL, _values(_PARTICIPANT_COLUMNS, rows))
+
+def insert_perk_stats_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_PERK_STATS_SQL, _values(PERK_STATS_KEYS, rows))
+
+def insert_perk_styles_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_PERK_STYLES_SQL, _values(PERK_STYLE_KEYS, rows))
+
+def insert_perk_selections_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_PERK_SELECTIONS_SQL, _values(PERK_SELECTION_KEYS, rows))
+
+def insert_teams_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_TEAMS_SQL, _values(TEAM_KEYS, rows))
+
+def insert_team_objectives_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_TEAM_OBJECTIVES_SQL, _values(TEAM_OBJECTIVE_KEYS, rows))
+
+def insert_team_bans_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_TEAM_BANS_SQL, _values(TEAM_BAN_KEYS, rows))
+
+def insert_matches_many(cursor, rows: list[dict]):
+    cursor.executemany(_INSERT_MATCH_SQL, _values(MATCH_KEYS, rows))
+
+# build_rows table name -> batched insert, parents before children
+_BUNDLE_INSERTS = (
+    ("matches", insert_matches_many),
+    ("participants", insert_participants_many),
+    ("perk_stats", insert_perk_stats_many),
+    ("perk_styles", insert_perk_styles_many),
+    ("perk_selections", insert_perk_selections_many),
+    ("teams", insert_teams_many),
+    ("team_objectives", insert_team_objectives_many),
+    ("team_bans", insert_team_bans_many),
+)
+
+def insert_match_bundles(cursor, bundles: list[dict[str, list[dict]]]):
+    """
+    Insert several cleaned matches (cleaner.build_rows output) with one executemany per table.
+    Does not commit: the caller owns the transaction, so writes can be wrapped
+    in a savepoint and many matches share one commit.
+    """
+    for table, insert_many in _BUNDLE_INSERTS:
+        insert_many(cursor, [row for bundle in bundles for row in bundle[table]])
+
+def insert_match_bundle(cursor, bundle: dict[str, list[dict]]):
+    """Insert one cleaned match; see insert_match_bundles."""
+    insert_match_bundles(cursor, [bundle])
@@ -0,0 +1,38 @@
+# progress.py
+
+import sys
+import time
+
+
+class Progress:
+    """
+    Throttled single-line progress output.
+
+    On a terminal the line is redrawn in place at most every `interval` seconds.
+    When stdout is not a TTY (e.g. redirected to a file) a plain line is printed
+    every `pipe_every` items instead, so logs don't fill with carriage returns.
+    """
+    def __init__(self, width: int = 120, interval: float = 0.1, pipe_every: int = 10000):
+        self.width = width
+        self.interval = interval
+        self.pipe_every = pipe_every
+        self.is_tty = sys.stdout.isatty()
+        self.last_drawn = 0.0
+        self.last_logged = 0
+
+    def due(self, done: int) -> bool:
+        """Whether an update for `done` items should be shown now; check before formatting the line."""
+        if self.is_tty:
+            return time.monotonic() - self.last_drawn >= self.interval
+        return done - self.last_logged >= self.pipe_every
+
+    def show(self, line: str, done: int = 0):
+        """Write the progress line unconditionally."""
+        if self.is_tty:
+            # Pad instead of printing a separate blank line to clear the previous one
+            sys.stdout.write("\r" + line.ljust(self.width))
+            sys.stdout.flush()
+            self.last_drawn = time.monotonic()
+        else:
+            print(line, flush=True)
+            self.last_logged = done
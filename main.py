@@ -1,8 +1,11 @@
+import logging
 from api.riot_client import RiotAPIClient
 from data.collector import collect_matches
 from data.cleaner import clean_matches_from_db
 
 def main():
+    # Start log lines on a fresh line so they don't overwrite the progress output
+    logging.basicConfig(level=logging.INFO, format="\n[%(levelname)s] %(name)s: %(message)s")
     client = RiotAPIClient()
     raw_db_path = "raw_match_data.db"
 
@@ -11,11 +14,15 @@ def main():
     collect_min_patch = "15.15"
 
     collect_matches(client=client, db_path=raw_db_path, top=top, matches_per_player=matches_per_player, min_patch=collect_min_patch)
+    client.close()
 
     clean_db_path = "cleaned_match_data.db"
     min_duration = None
     clean_min_patch = None
+    clean_workers = None  # e.g. os.cpu_count() to parse raw JSON in parallel
 
-    clean_matches_from_db(raw_db_path=raw_db_path, clean_db_path=clean_db_path, min_duration=min_duration, min_patch=clean_min_patch)
+    clean_matches_from_db(raw_db_path=raw_db_path, clean_db_path=clean_db_path, min_duration=min_duration, min_patch=clean_min_patch, workers=clean_workers)
 
-main()
\ No newline at end of file
+# Guarded so ProcessPoolExecutor workers can re-import this module safely
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from data.cleaner import clean_matches_from_db
+from data.database import create_raw_matches_table
+
+
+def make_match(match_id: str, duration: int = 1800, version: str = "15.16.1.2") -> dict:
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameDuration": duration,
+            "gameVersion": version,
+            "endOfGameResult": "GameComplete",
+            "participants": [
+                {"puuid": f"{match_id}_p{i}", "teamId": 100 if i < 5 else 200, "win": i < 5, "kills": i}
+                for i in range(10)
+            ],
+            "teams": [{"teamId": 100, "win": True, "bans": [], "objectives": {}},
+                      {"teamId": 200, "win": False, "bans": [], "objectives": {}}]
+        }
+    }
+
+
+def raw_row(match: dict) -> tuple[str, str, str]:
+    return match["metadata"]["matchId"], match["info"]["gameVersion"], json.dumps(match)
+
+
+class CleanMatchesFromDbTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raw_db_path = os.path.join(self.tmp.name, "raw.db")
+        self.clean_db_path = os.path.join(self.tmp.name, "clean.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_raw(self, rows: list[tuple[str, str, str]]):
+        conn = sqlite3.connect(self.raw_db_path)
+        create_raw_matches_table(conn)
+        conn.executemany("INSERT INTO raw_matches (match_id, gameVersion, data) VALUES (?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def clean_counts(self) -> tuple[set[str], int]:
+        conn = sqlite3.connect(self.clean_db_path)
+        match_ids = {row[0] for row in conn.execute("SELECT match_id FROM matches")}
+        participants = conn.execute("SELECT COUNT(*) FROM participants").fetchone()[0]
+        conn.close()
+        return match_ids, participants
+
+    def test_invalid_json_row_does_not_abort_duration_filtered_clean(self):
+        rows = [raw_row(m) for m in (make_match("NA1_1"), make_match("NA1_2"), make_match("NA1_3", duration=100))]
+        rows.insert(1, ("NA1_BAD", "15.16.1.2", "{not valid json"))
+        self.write_raw(rows)
+
+        with self.assertLogs("data.cleaner", level="WARNING") as logs:
+            clean_matches_from_db(self.raw_db_path, self.clean_db_path, min_duration=300)
+
+        match_ids, participants = self.clean_counts()
+        self.assertEqual(match_ids, {"NA1_1", "NA1_2"})
+        self.assertEqual(participants, 20)
+        self.assertTrue(any("NA1_BAD" in line for line in logs.output))
+
+    def test_unbindable_value_drops_only_that_match_from_its_batch(self):
+        bad = make_match("NA1_BAD")
+        # Parses fine, but sqlite3 cannot bind a dict, so the batched write fails
+        bad["info"]["participants"][3]["kills"] = {"nested": 1}
+        self.write_raw([raw_row(m) for m in (make_match("NA1_1"), bad, make_match("NA1_2"), make_match("NA1_3"))])
+
+        with self.assertLogs("data.cleaner", level="WARNING") as logs:
+            clean_matches_from_db(self.raw_db_path, self.clean_db_path, insert_every=10)
+
+        match_ids, participants = self.clean_counts()
+        self.assertEqual(match_ids, {"NA1_1", "NA1_2", "NA1_3"})
+        self.assertEqual(participants, 30)
+        self.assertTrue(any("NA1_BAD" in line for line in logs.output))
+
+        # A re-run gets past the bad row again instead of aborting
+        with self.assertLogs("data.cleaner", level="WARNING"):
+            clean_matches_from_db(self.raw_db_path, self.clean_db_path, insert_every=10)
+        self.assertEqual(self.clean_counts(), (match_ids, participants))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from api.endpoints import get_all_match_history
+
+
+class FakeClient:
+    """Serves match ids from a fixed history and records the params of each call."""
+    def __init__(self, history: list[str], fail_at_start: int | None = None):
+        self.history = history
+        self.fail_at_start = fail_at_start
+        self.calls = []
+
+    def request(self, url, params=None, max_attempts=5):
+        self.calls.append(dict(params))
+        start, count = params["start"], params["count"]
+        if start == self.fail_at_start:
+            return None
+        return self.history[start:start + count]
+
+
+def ids(n: int) -> list[str]:
+    return [f"NA1_{i}" for i in range(n)]
+
+
+class GetAllMatchHistoryTest(unittest.TestCase):
+    def test_pages_until_total(self):
+        client = FakeClient(ids(500))
+        result = get_all_match_history(client, "puuid", total=250)
+
+        self.assertEqual(result, ids(250))
+        self.assertEqual([(c["start"], c["count"]) for c in client.calls], [(0, 100), (100, 100), (200, 50)])
+
+    def test_stops_after_short_page(self):
+        client = FakeClient(ids(130))
+        result = get_all_match_history(client, "puuid", total=500)
+
+        self.assertEqual(result, ids(130))
+        self.assertEqual(len(client.calls), 2)
+
+    def test_returns_none_when_first_page_fails(self):
+        client = FakeClient(ids(500), fail_at_start=0)
+        self.assertIsNone(get_all_match_history(client, "puuid", total=200))
+
+    def test_keeps_earlier_pages_when_a_later_page_fails(self):
+        client = FakeClient(ids(500), fail_at_start=100)
+        self.assertEqual(get_all_match_history(client, "puuid", total=300), ids(100))
+
+    def test_dedups_ids_shifted_between_pages(self):
+        # A game finished mid-crawl pushes NA1_99 onto the second page as well
+        history = ids(100) + ["NA1_99"] + [f"NA1_{i}" for i in range(100, 150)]
+        result = get_all_match_history(client=FakeClient(history), puuid="puuid", total=300)
+
+        self.assertEqual(result, ids(150))
+
+    def test_page_is_clamped_to_riot_limits(self):
+        client = FakeClient(ids(500))
+        get_all_match_history(client, "puuid", total=300, page=250)
+        self.assertTrue(all(c["count"] <= 100 for c in client.calls))
+
+        for page in (0, -5):
+            client = FakeClient(ids(3))
+            self.assertEqual(get_all_match_history(client, "puuid", total=3, page=page), ids(3))
+            self.assertTrue(all(c["count"] == 1 for c in client.calls))
+
+
+if __name__ == "__main__":
+    unittest.main()
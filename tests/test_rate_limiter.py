@@ -0,0 +1,129 @@
+import threading
+import unittest
+from collections import deque
+from unittest import mock
+
+from api import riot_client
+from api.riot_client import RateLimiter
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances the clock instead of blocking."""
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.lock = threading.Lock()
+
+    def time(self) -> float:
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds: float):
+        with self.lock:
+            self.now += max(seconds, 0)
+
+
+class RecordingDeque(deque):
+    """Keeps every timestamp the limiter admits, even after it is trimmed from the window."""
+    def __init__(self):
+        super().__init__()
+        self.admitted = []
+
+    def append(self, ts):
+        self.admitted.append(ts)
+        super().append(ts)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(riot_client, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_limiter(self, limits=None) -> RateLimiter:
+        limiter = RateLimiter(limits or {1: 20, 120: 100})
+        limiter.timestamps = RecordingDeque()
+        return limiter
+
+    def assert_windows_hold(self, admitted: list[float], limits: dict[int, int]):
+        admitted = sorted(admitted)
+        eps = 1e-9
+        for seconds, max_requests in limits.items():
+            for i in range(len(admitted) - max_requests):
+                # Request i and request i + max_requests can never share one window
+                self.assertGreaterEqual(admitted[i + max_requests] - admitted[i], seconds - eps)
+
+    def test_windows_hold_under_concurrent_acquire(self):
+        limiter = self.make_limiter()
+        threads, per_thread = 8, 40
+
+        def worker():
+            for _ in range(per_thread):
+                limiter.acquire()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join(timeout=30)
+            self.assertFalse(t.is_alive())
+
+        admitted = limiter.timestamps.admitted
+        self.assertEqual(len(admitted), threads * per_thread)
+        self.assert_windows_hold(admitted, {1: 20, 120: 100})
+        # 320 requests at 100 per 120s need at least three full windows
+        self.assertGreaterEqual(max(admitted) - min(admitted), 3 * 120 - 1e-9)
+
+    def test_first_window_burst_is_admitted_without_waiting(self):
+        limiter = self.make_limiter()
+        for _ in range(20):
+            limiter.acquire()
+        self.assertEqual(self.clock.time(), 1000.0)
+        limiter.acquire()
+        self.assertGreaterEqual(self.clock.time(), 1001.0)
+
+    def test_sync_applies_server_counts(self):
+        limiter = self.make_limiter()
+        limiter.acquire()
+        # Riot has seen 60 requests this window, e.g. from another process on the same key
+        limiter.sync({"X-App-Rate-Limit": "20:1,100:120", "X-App-Rate-Limit-Count": "1:1,60:120"})
+        self.assertEqual(len(limiter.timestamps), 60)
+
+        # Only the remaining 40 fit before the 120s window forces a wait
+        start = self.clock.time()
+        for _ in range(40):
+            limiter.acquire()
+            self.clock.sleep(1)  # stay clear of the 1s window
+        self.assertLess(self.clock.time() - start, 120)
+        limiter.acquire()
+        self.assertGreaterEqual(self.clock.time() - start, 120 - 1e-9)
+
+    def test_sync_replaces_limits_from_headers(self):
+        limiter = self.make_limiter()
+        limiter.sync({"X-App-Rate-Limit": "10:1,50:60"})
+        self.assertEqual(limiter.limits, {1: 10, 60: 50})
+
+        for _ in range(10):
+            limiter.acquire()
+        self.assertEqual(self.clock.time(), 1000.0)
+        limiter.acquire()
+        self.assertGreaterEqual(self.clock.time(), 1001.0)
+
+    def test_sync_without_headers_keeps_limits(self):
+        limiter = self.make_limiter()
+        limiter.sync({})
+        self.assertEqual(limiter.limits, {1: 20, 120: 100})
+        self.assertEqual(len(limiter.timestamps), 0)
+
+    def test_pause_blocks_every_caller(self):
+        limiter = self.make_limiter()
+        limiter.acquire()
+        limiter.pause(5)
+        self.assertEqual(len(limiter.timestamps), 0)
+
+        limiter.acquire()
+        self.assertGreaterEqual(self.clock.time(), 1005.0)
+
+
+if __name__ == "__main__":
+    unittest.main()